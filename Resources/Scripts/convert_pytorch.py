@@ -5,16 +5,103 @@ Converts .pt/.pth files to CoreML or MLX (safetensors) format
 Communicates progress via JSON-line protocol on stdout
 """
 
+import collections
 import json
+import math
+import mmap
+import os
+import pickle
+import re
+import shutil
+import struct
 import sys
+import time
+import zipfile
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-
-def emit(event_type: str, **kwargs):
-    """Emit a JSON event to stdout for the Swift app to consume."""
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Largest model (in bytes) serialized in memory before being written out
+IN_MEMORY_SAVE_LIMIT = 1 << 30
+
+# safetensors dtype codes, named the way torch reports them in layer info
+SAFETENSORS_DTYPES = {
+    "F64": "torch.float64",
+    "F32": "torch.float32",
+    "F16": "torch.float16",
+    "BF16": "torch.bfloat16",
+    "I64": "torch.int64",
+    "I32": "torch.int32",
+    "I16": "torch.int16",
+    "I8": "torch.int8",
+    "U8": "torch.uint8",
+    "BOOL": "torch.bool",
+}
+
+# numpy dtypes for the torch storage classes the fast passthrough will unpickle
+PICKLE_STORAGE_DTYPES = {
+    "DoubleStorage": "float64",
+    "FloatStorage": "float32",
+    "HalfStorage": "float16",
+    "LongStorage": "int64",
+    "IntStorage": "int32",
+    "ShortStorage": "int16",
+    "CharStorage": "int8",
+    "ByteStorage": "uint8",
+    "BoolStorage": "bool",
+}
+
+# macOS fcntl command for read advisories (F_RDADVISE in <sys/fcntl.h>);
+# Python's fcntl module doesn't export it
+F_RDADVISE = 44
+
+# Largest range a single macOS F_RDADVISE request can cover (ra_count is an int)
+RDADVISE_CHUNK = 2**31 - 1
+
+# Only prefetch checkpoints smaller than this share of physical memory
+PREFETCH_MEMORY_FRACTION = 0.5
+
+# Largest dummy input (in elements) allowed for tracing
+MAX_INPUT_ELEMENTS = 1 << 30
+
+# Upper bound on threads preparing tensors for safetensors
+MAX_PREPARE_WORKERS = 8
+
+# Minimum seconds between fine-grained progress events
+PROGRESS_INTERVAL = 0.1
+
+# Seconds allowed for coremltools conversion, between heartbeats while waiting,
+# and between checks on the worker
+COREML_TIMEOUT = 15 * 60
+COREML_HEARTBEAT_INTERVAL = 30
+COREML_POLL_INTERVAL = 1.0
+
+_last_progress = 0.0
+
+
+def dumps(obj) -> str:
+    """Serialize to compact JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"))
+
+
+def emit(event_type: str, flush: bool = False, **kwargs):
+    """Emit a JSON event to stdout for the Swift app to consume.
+
+    Only progress, completed and error events flush stdout; log lines go
+    out with the next flush. This relies on stdout being block-buffered,
+    so the app must not run the script with PYTHONUNBUFFERED set.
+    """
     event = {"type": event_type, **kwargs}
-    print(json.dumps(event), flush=True)
+    sys.stdout.write(dumps(event) + "\n")
+    if flush:
+        sys.stdout.flush()
 
 
 def log(level: str, message: str):
@@ -24,35 +111,56 @@ def log(level: str, message: str):
 
 def progress(percent: float, step: str):
     """Emit a progress event (0.0 to 1.0)."""
-    emit("progress", percent=percent, step=step)
+    global _last_progress
+    _last_progress = time.monotonic()
+    emit("progress", flush=True, percent=percent, step=step)
+
+
+def throttled_progress(percent: float, step: str):
+    """Emit a progress event unless one was sent within PROGRESS_INTERVAL."""
+    if percent in (0.0, 1.0) or time.monotonic() - _last_progress > PROGRESS_INTERVAL:
+        progress(percent, step)
 
 
 def completed(output_path: str, format: str, metadata: dict):
     """Emit conversion completed event."""
-    emit("completed", outputPath=output_path, format=format, metadata=metadata)
+    emit("completed", flush=True, outputPath=output_path, format=format, metadata=metadata)
 
 
 def error(message: str, code: str = "UNKNOWN"):
     """Emit an error event."""
-    emit("error", message=message, code=code)
+    emit("error", flush=True, message=message, code=code)
 
 
-def load_pytorch_model(model_path: str, input_shape: tuple):
-    """Load and trace PyTorch model."""
+def load_pytorch_model(model_path: str, input_shape: tuple, target_format: str = "coreml"):
+    """Load PyTorch model, tracing it only when converting to CoreML."""
     import torch
 
     log("info", f"Loading PyTorch model from {model_path}")
     progress(0.1, "Loading model")
 
-    # Load the checkpoint
-    try:
-        checkpoint = torch.load(model_path, map_location="cpu", weights_only=False)
-    except Exception as e:
-        # Try with weights_only=True for newer PyTorch
+    # Load the checkpoint, memory-mapping it where possible so weights are
+    # paged in on demand rather than copied into RAM up front. Legacy
+    # (non-zip) checkpoints can't be mapped and fall through to a plain load.
+    load_options = [{"weights_only": True}, {"weights_only": False}]
+    if torch.__version__ >= "2.1":
+        load_options = [
+            {"weights_only": True, "mmap": True},
+            {"weights_only": False, "mmap": True},
+        ] + load_options
+
+    for options in load_options:
         try:
-            checkpoint = torch.load(model_path, map_location="cpu", weights_only=True)
-        except Exception:
-            raise RuntimeError(f"Failed to load model: {e}")
+            checkpoint = torch.load(model_path, map_location="cpu", **options)
+            break
+        except Exception as e:
+            load_error = e
+    else:
+        raise RuntimeError(f"Failed to load model: {load_error}")
+
+    # Mapped weights are all read during conversion; start paging them in
+    if options.get("mmap"):
+        prefetch_file(model_path)
 
     progress(0.2, "Analyzing checkpoint")
 
@@ -91,6 +199,16 @@ def load_pytorch_model(model_path: str, input_shape: tuple):
         log("info", "MLX conversion will proceed with raw weights")
         return None, state_dict, checkpoint
 
+    # MLX only needs the weights, so skip the forward pass tracing would run
+    if target_format == "mlx" and model is not None:
+        if hasattr(model, "state_dict"):
+            log("info", "Extracted state_dict from model")
+            return None, model.state_dict(), checkpoint
+        if isinstance(model, dict) and all(isinstance(v, torch.Tensor) for v in model.values()):
+            log("info", "Model entry appears to be a state_dict")
+            return None, model, checkpoint
+        return None, None, checkpoint
+
     # Set to eval mode
     if model is not None:
         model.eval()
@@ -125,39 +243,330 @@ def load_pytorch_model(model_path: str, input_shape: tuple):
     raise RuntimeError("Could not extract model or state_dict from checkpoint")
 
 
-def convert_to_coreml(traced_model, input_shape: tuple, output_path: str, model_name: str):
-    """Convert traced PyTorch model to CoreML."""
+def prefetch_file(path: str):
+    """Ask the kernel to start reading a file into the page cache.
+
+    This acts on the page cache rather than on a file descriptor or
+    mapping, so torch's own mapping of the file benefits from it. Files
+    that are not comfortably smaller than physical memory are left alone:
+    prefetching them would evict the early pages before conversion reads
+    them and push other applications out of memory.
+    """
     try:
-        import coremltools as ct
+        physical_memory = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError):
+        return
+
+    try:
+        with open(path, "rb") as f:
+            fd = f.fileno()
+            size = os.fstat(fd).st_size
+            if size > physical_memory * PREFETCH_MEMORY_FRACTION:
+                log("info", "Checkpoint is large relative to memory, skipping prefetch")
+                return
+
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            elif sys.platform == "darwin":
+                import fcntl
+
+                # macOS has no posix_fadvise; F_RDADVISE takes a
+                # struct radvisory { off_t ra_offset; int ra_count; },
+                # so cover the file in int-sized chunks
+                for offset in range(0, size, RDADVISE_CHUNK):
+                    count = min(RDADVISE_CHUNK, size - offset)
+                    fcntl.fcntl(fd, F_RDADVISE, struct.pack("qi4x", offset, count))
+    except OSError as e:
+        log("warning", f"Could not prefetch {path}: {e}")
+
+
+class PassthroughUnavailable(Exception):
+    """The checkpoint can't be converted without torch."""
+
+
+class StateDictUnpickler(pickle.Unpickler):
+    """Unpickler for torch zip checkpoints that only rebuilds plain tensors.
+
+    Globals are restricted to an allowlist, so no code from the checkpoint
+    runs, and tensors come back as numpy arrays over the mapped file.
+    """
+
+    def __init__(self, file, load_storage):
+        super().__init__(file)
+        self.load_storage = load_storage
+
+    def find_class(self, module, name):
+        if module == "collections" and name == "OrderedDict":
+            return collections.OrderedDict
+        if module == "torch._utils" and name == "_rebuild_tensor_v2":
+            return _rebuild_tensor
+        if module == "torch._utils" and name == "_rebuild_parameter":
+            return _rebuild_parameter
+        if module == "torch" and name in PICKLE_STORAGE_DTYPES:
+            return name
+        raise pickle.UnpicklingError(f"Disallowed global in checkpoint: {module}.{name}")
+
+    def persistent_load(self, pid):
+        if not (isinstance(pid, tuple) and len(pid) == 5 and pid[0] == "storage"):
+            raise pickle.UnpicklingError(f"Unsupported persistent id: {pid!r}")
+        _, storage_type, key, _location, numel = pid
+        return self.load_storage(storage_type, key, numel)
+
+
+def _rebuild_tensor(storage, storage_offset, size, stride, *_):
+    """Stand-in for torch._utils._rebuild_tensor_v2 that returns a numpy view.
+
+    The view's geometry comes from the checkpoint, so it is checked against
+    the storage before as_strided can be pointed outside the buffer.
+    """
+    import numpy as np
+
+    size, stride = tuple(size), tuple(stride)
+    if len(size) != len(stride) or any(n < 0 for n in size) or any(st < 0 for st in stride):
+        raise pickle.UnpicklingError(f"Invalid tensor geometry: size={size}, stride={stride}")
+    if not 0 <= storage_offset <= len(storage):
+        raise pickle.UnpicklingError(f"Tensor offset {storage_offset} outside storage")
+    if 0 not in size:
+        last = storage_offset + sum((n - 1) * st for n, st in zip(size, stride))
+        if last >= len(storage):
+            raise pickle.UnpicklingError("Tensor extends past the end of its storage")
+
+    array = np.lib.stride_tricks.as_strided(
+        storage[storage_offset:],
+        shape=size,
+        strides=tuple(step * storage.itemsize for step in stride)
+    )
+    return array if array.flags.c_contiguous else np.ascontiguousarray(array)
+
+
+def _rebuild_parameter(data, *_):
+    """Stand-in for torch._utils._rebuild_parameter."""
+    return data
+
+
+def load_state_dict_without_torch(model_path: str) -> dict:
+    """Read a plain state_dict from a torch zip checkpoint as numpy arrays.
+
+    Storages are memory-mapped straight out of the archive. Raises
+    PassthroughUnavailable for anything but a dict of plain tensors.
+    """
+    import numpy as np
+
+    with zipfile.ZipFile(model_path) as archive:
+        names = archive.namelist()
+        pickle_name = next((n for n in names if n.endswith("/data.pkl")), None)
+        if pickle_name is None:
+            raise PassthroughUnavailable("not a torch zip checkpoint")
+        prefix = pickle_name[:-len("data.pkl")]
+
+        if f"{prefix}byteorder" in names and archive.read(f"{prefix}byteorder") != b"little":
+            raise PassthroughUnavailable("big-endian checkpoint")
+
+        with open(model_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        def load_storage(storage_type, key, numel):
+            dtype = np.dtype(PICKLE_STORAGE_DTYPES[storage_type])
+            try:
+                info = archive.getinfo(f"{prefix}data/{key}")
+            except KeyError:
+                raise pickle.UnpicklingError(f"Missing storage in checkpoint: {key}")
+            if numel < 0 or numel * dtype.itemsize > info.file_size:
+                raise pickle.UnpicklingError(f"Storage {key} is larger than its archive entry")
+            if info.compress_type != zipfile.ZIP_STORED:
+                return np.frombuffer(archive.read(info), dtype=dtype, count=numel)
+            # Skip the local file header to find where the entry's bytes start
+            name_len, extra_len = struct.unpack(
+                "<HH", mapped[info.header_offset + 26:info.header_offset + 30]
+            )
+            offset = info.header_offset + 30 + name_len + extra_len
+            return np.frombuffer(mapped, dtype=dtype, count=numel, offset=offset)
+
+        # Malformed geometry or storage records surface as assorted errors
+        # from numpy and struct; any of them means torch should take over
+        with archive.open(pickle_name) as f:
+            try:
+                checkpoint = StateDictUnpickler(f, load_storage).load()
+            except (ValueError, TypeError, KeyError, IndexError, struct.error) as e:
+                raise PassthroughUnavailable(f"unreadable checkpoint: {e}") from e
+
+    if isinstance(checkpoint, dict):
+        for key in ("state_dict", "model_state_dict"):
+            if isinstance(checkpoint.get(key), dict):
+                checkpoint = checkpoint[key]
+                break
+
+    if not isinstance(checkpoint, dict) or not all(
+        isinstance(v, np.ndarray) for v in checkpoint.values()
+    ):
+        raise PassthroughUnavailable("checkpoint is not a plain state_dict")
+
+    return checkpoint
+
+
+def convert_checkpoint_without_torch(model_path: str, input_shape: tuple, output_path: str) -> dict:
+    """Convert a state_dict-only .pt file to MLX safetensors without importing torch."""
+    try:
+        from safetensors.numpy import save_file
     except ImportError:
+        error("safetensors not installed. Run: pip install safetensors", "MISSING_PACKAGE")
+        sys.exit(1)
+
+    log("info", f"Reading state_dict from {model_path} without torch")
+    progress(0.1, "Loading model")
+
+    tensors = load_state_dict_without_torch(model_path)
+
+    progress(0.6, "Processing tensors")
+
+    layer_info = []
+    total_params = 0
+    for key, array in tensors.items():
+        layer_info.append({
+            "name": key,
+            "shape": list(array.shape),
+            "dtype": f"torch.{array.dtype}"
+        })
+        total_params += array.size
+
+    progress(0.8, "Saving safetensors")
+
+    output_path = Path(output_path)
+    log("info", f"Saving MLX model to {output_path}")
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    try:
+        save_file(tensors, tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return save_mlx_metadata(layer_info, total_params, input_shape, output_path)
+
+
+def convert_to_coreml(traced_model, input_shape: tuple, output_path: str, model_name: str,
+                      timeout: float = COREML_TIMEOUT):
+    """Convert traced PyTorch model to CoreML.
+
+    coremltools runs in a spawned worker process so a conversion that
+    hangs can be killed once `timeout` seconds have passed.
+    """
+    import importlib.util
+    import multiprocessing
+    import queue
+    import tempfile
+    import torch
+
+    # Only check the package is there; the worker does the (slow) import
+    if importlib.util.find_spec("coremltools") is None:
         error("coremltools not installed. Run: pip install coremltools", "MISSING_PACKAGE")
         sys.exit(1)
 
     log("info", "Converting to CoreML format")
     progress(0.5, "Converting to CoreML")
 
-    # Determine input type based on shape
-    if len(input_shape) == 4:  # Image: (B, C, H, W)
-        _, channels, height, width = input_shape
-        if channels in [1, 3, 4]:
-            # Image input
-            input_type = ct.ImageType(
-                name="input",
-                shape=input_shape,
-                channel_first=True,
-                color_layout=ct.colorlayout.RGB if channels == 3 else ct.colorlayout.GRAYSCALE
-            )
-            log("info", f"Using ImageType input: {channels}ch {height}x{width}")
+    context = multiprocessing.get_context("spawn")
+    result_queue = context.Queue()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Hand the model over as a TorchScript file rather than pickling a live module
+        traced_path = os.path.join(tmp_dir, "traced.pt")
+        torch.jit.save(traced_model, traced_path)
+
+        worker = context.Process(
+            target=_coreml_worker,
+            args=(traced_path, input_shape, output_path, model_name, result_queue)
+        )
+        worker.start()
+
+        # Wait for the worker's result, sending a heartbeat while it is still
+        # busy. The queue is drained before joining: a worker blocked on
+        # flushing a large message into the pipe would otherwise never exit.
+        deadline = time.monotonic() + timeout
+        next_heartbeat = time.monotonic() + COREML_HEARTBEAT_INTERVAL
+        while True:
+            wait = min(COREML_POLL_INTERVAL, max(0.0, deadline - time.monotonic()))
+            try:
+                error_msg = result_queue.get(timeout=wait)
+                break
+            except queue.Empty:
+                pass
+
+            if not worker.is_alive():
+                # The result may have landed just before the worker exited
+                try:
+                    error_msg = result_queue.get(timeout=1)
+                except queue.Empty:
+                    error_msg = f"Conversion process exited with code {worker.exitcode}"
+                break
+
+            if time.monotonic() >= deadline:
+                worker.terminate()
+                worker.join()
+                shutil.rmtree(output_path, ignore_errors=True)
+                error(f"CoreML conversion exceeded timeout of {int(timeout)}s", "TIMEOUT")
+                sys.exit(1)
+
+            if time.monotonic() >= next_heartbeat:
+                next_heartbeat += COREML_HEARTBEAT_INTERVAL
+                emit("log", flush=True, level="info", message="CoreML conversion still running...")
+
+        worker.join()
+
+    if error_msg is not None:
+        if "not supported" in error_msg.lower():
+            error(f"Model contains unsupported operations: {error_msg}", "UNSUPPORTED_OP")
+        elif "shape" in error_msg.lower():
+            error(f"Shape mismatch during conversion: {error_msg}", "SHAPE_MISMATCH")
+        else:
+            error(f"CoreML conversion failed: {error_msg}", "CONVERSION_FAILED")
+        sys.exit(1)
+
+    progress(1.0, "Complete")
+
+    # Extract metadata
+    metadata = {
+        "inputShape": list(input_shape),
+        "format": "coreml",
+        "computeUnits": "all",
+        "deploymentTarget": "macOS14"
+    }
+
+    return metadata
+
+
+def _coreml_worker(traced_path: str, input_shape: tuple, output_path: str, model_name: str,
+                   result_queue):
+    """Run coremltools conversion in the worker process.
+
+    Puts None on `result_queue` on success, or the error message on failure.
+    """
+    try:
+        import coremltools as ct
+        import torch
+
+        traced_model = torch.jit.load(traced_path)
+
+        # Determine input type based on shape
+        if len(input_shape) == 4:  # Image: (B, C, H, W)
+            _, channels, height, width = input_shape
+            if channels in [1, 3, 4]:
+                # Image input
+                input_type = ct.ImageType(
+                    name="input",
+                    shape=input_shape,
+                    channel_first=True,
+                    color_layout=ct.colorlayout.RGB if channels == 3 else ct.colorlayout.GRAYSCALE
+                )
+                log("info", f"Using ImageType input: {channels}ch {height}x{width}")
+            else:
+                input_type = ct.TensorType(name="input", shape=input_shape)
+                log("info", f"Using TensorType input: {input_shape}")
         else:
             input_type = ct.TensorType(name="input", shape=input_shape)
             log("info", f"Using TensorType input: {input_shape}")
-    else:
-        input_type = ct.TensorType(name="input", shape=input_shape)
-        log("info", f"Using TensorType input: {input_shape}")
 
-    progress(0.6, "Running coremltools conversion")
+        progress(0.6, "Running coremltools conversion")
 
-    try:
         # Convert to CoreML
         mlmodel = ct.convert(
             traced_model,
@@ -178,34 +587,22 @@ def convert_to_coreml(traced_model, input_shape: tuple, output_path: str, model_
         log("info", f"Saving CoreML model to {output_path}")
         mlmodel.save(output_path)
 
-        progress(1.0, "Complete")
-
-        # Extract metadata
-        metadata = {
-            "inputShape": list(input_shape),
-            "format": "coreml",
-            "computeUnits": "all",
-            "deploymentTarget": "macOS14"
-        }
-
-        return metadata
+        result_queue.put(None)
 
     except Exception as e:
-        error_msg = str(e)
-        if "not supported" in error_msg.lower():
-            error(f"Model contains unsupported operations: {error_msg}", "UNSUPPORTED_OP")
-        elif "shape" in error_msg.lower():
-            error(f"Shape mismatch during conversion: {error_msg}", "SHAPE_MISMATCH")
-        else:
-            error(f"CoreML conversion failed: {error_msg}", "CONVERSION_FAILED")
-        sys.exit(1)
+        result_queue.put(str(e))
+
 
+def convert_to_mlx(state_dict, input_shape: tuple, output_path: str, checkpoint,
+                   dtype: str = "preserve"):
+    """Convert PyTorch model to MLX safetensors format.
 
-def convert_to_mlx(state_dict, input_shape: tuple, output_path: str, checkpoint):
-    """Convert PyTorch model to MLX safetensors format."""
+    Floating-point weights keep their source dtype unless `dtype` names a
+    target type to cast them to.
+    """
     try:
         import torch
-        from safetensors.torch import save_file
+        from safetensors.torch import save, save_file
     except ImportError:
         error("safetensors not installed. Run: pip install safetensors", "MISSING_PACKAGE")
         sys.exit(1)
@@ -233,37 +630,144 @@ def convert_to_mlx(state_dict, input_shape: tuple, output_path: str, checkpoint)
 
     progress(0.6, "Processing tensors")
 
-    # Convert tensors and prepare for safetensors
-    tensors = {}
-    layer_info = []
+    target_dtype = {
+        "preserve": None,
+        "float32": torch.float32,
+        "float16": torch.float16,
+        "bfloat16": torch.bfloat16,
+    }[dtype]
 
-    for key, tensor in state_dict.items():
-        # Skip non-tensor items
-        if not isinstance(tensor, torch.Tensor):
-            continue
+    def needs_prepare(tensor):
+        cast = (target_dtype is not None and tensor.is_floating_point()
+                and tensor.dtype != target_dtype)
+        return cast or not tensor.is_contiguous()
 
-        # Convert to float32 for compatibility
-        if tensor.dtype in [torch.float16, torch.bfloat16]:
-            tensor = tensor.float()
+    def prepare(tensor):
+        # Cast floating-point weights only when a target dtype was requested
+        if target_dtype is not None and tensor.is_floating_point():
+            tensor = tensor.to(target_dtype)
 
         # Ensure contiguous
-        tensor = tensor.contiguous()
-        tensors[key] = tensor
+        return tensor.contiguous()
+
+    # Convert tensors in place, replacing each weight under its own key so
+    # the original is released once converted; non-tensor items are dropped
+    tensors = state_dict
+    for key in list(tensors):
+        if not isinstance(tensors[key], torch.Tensor):
+            del tensors[key]
+
+    if not tensors:
+        error("No tensors found in checkpoint", "INVALID_CHECKPOINT")
+        sys.exit(1)
+
+    # Weights that are already contiguous in the target dtype are passed
+    # through untouched, so mmap-backed storage is aliased rather than copied.
+    # The rest are cast/copied on a bounded thread pool, since those ops
+    # release the GIL; map() yields results in key order.
+    pending = [key for key, tensor in tensors.items() if needs_prepare(tensor)]
+    workers = min(os.cpu_count() or 1, MAX_PREPARE_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        prepared = executor.map(prepare, (tensors[key] for key in pending))
+        for index, (key, tensor) in enumerate(zip(pending, prepared)):
+            throttled_progress(0.6 + 0.2 * index / len(pending), "Processing tensors")
+            tensors[key] = tensor
+
+    # Tied weights (e.g. an embedding shared with the LM head) alias one
+    # storage, which safetensors refuses to write; give every alias after
+    # the first its own copy
+    seen_storages = set()
+    for key, tensor in tensors.items():
+        storage_ptr = tensor.untyped_storage().data_ptr()
+        if storage_ptr in seen_storages:
+            tensors[key] = tensor.clone()
+        else:
+            seen_storages.add(storage_ptr)
 
-        # Record layer info for architecture inference
+    # Record layer info for architecture inference, totalling parameters
+    # and storage size in the same pass
+    layer_info = []
+    total_params = 0
+    total_bytes = 0
+    for key, tensor in tensors.items():
         layer_info.append({
             "name": key,
             "shape": list(tensor.shape),
             "dtype": str(tensor.dtype)
         })
+        total_params += tensor.numel()
+        total_bytes += tensor.numel() * tensor.element_size()
 
     progress(0.8, "Saving safetensors")
 
     # Save as safetensors
     output_path = Path(output_path)
     log("info", f"Saving MLX model to {output_path}")
-    save_file(tensors, output_path)
 
+    # Write to a temp file next to the target and rename it into place, so
+    # a failed write never leaves a truncated model behind
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    try:
+        if total_bytes <= IN_MEMORY_SAVE_LIMIT:
+            # Small enough to serialize in memory and write in one call
+            with open(tmp_path, "wb") as f:
+                f.write(save(tensors))
+        else:
+            save_file(tensors, tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    return save_mlx_metadata(layer_info, total_params, input_shape, output_path)
+
+
+def convert_safetensors_to_mlx(input_path: Path, input_shape: tuple, output_path: str) -> dict:
+    """Repack a .safetensors file for MLX without importing torch.
+
+    The weights are already in the target format, so the file is copied
+    into place and layer info is read from its header.
+    """
+    try:
+        from safetensors import safe_open
+    except ImportError:
+        error("safetensors not installed. Run: pip install safetensors", "MISSING_PACKAGE")
+        sys.exit(1)
+
+    log("info", "Repacking safetensors for MLX")
+    progress(0.5, "Reading safetensors header")
+
+    layer_info = []
+    total_params = 0
+    with safe_open(str(input_path), framework="numpy") as f:
+        for key in f.keys():
+            tensor_slice = f.get_slice(key)
+            shape = list(tensor_slice.get_shape())
+            dtype = tensor_slice.get_dtype()
+            layer_info.append({
+                "name": key,
+                "shape": shape,
+                "dtype": SAFETENSORS_DTYPES.get(dtype, dtype)
+            })
+            total_params += math.prod(shape)
+
+    progress(0.8, "Saving safetensors")
+
+    output_path = Path(output_path)
+    log("info", f"Saving MLX model to {output_path}")
+    if not (output_path.exists() and output_path.samefile(input_path)):
+        tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+        try:
+            shutil.copyfile(input_path, tmp_path)
+            os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    return save_mlx_metadata(layer_info, total_params, input_shape, output_path)
+
+
+def save_mlx_metadata(layer_info: list, total_params: int, input_shape: tuple,
+                      output_path: Path) -> dict:
+    """Write the metadata JSON next to an MLX model and return the summary for Swift."""
     progress(0.9, "Saving metadata")
 
     # Save metadata JSON alongside
@@ -274,13 +778,11 @@ def convert_to_mlx(state_dict, input_shape: tuple, output_path: str, checkpoint)
         "layerCount": len(layer_info),
         "layers": layer_info,
         "architectureType": infer_architecture(layer_info),
-        "totalParameters": sum(
-            tensor.numel() for tensor in tensors.values()
-        )
+        "totalParameters": total_params
     }
 
-    with open(metadata_path, "w") as f:
-        json.dump(metadata, f, indent=2)
+    # Compact JSON: the per-layer list dominates the file for large models
+    metadata_path.write_text(dumps(metadata))
 
     progress(1.0, "Complete")
 
@@ -294,31 +796,38 @@ def convert_to_mlx(state_dict, input_shape: tuple, output_path: str, checkpoint)
     }
 
 
+# Architecture hints, matched with a lookahead so overlapping tokens are all found
+ARCH_TOKENS = re.compile(
+    r"(?=(resnet|downsample|shortcut|conv|attention|transformer|encoder|vit|patch_embed|yolo|detect))"
+)
+LAYER_CONV = re.compile(r"layer.*conv|conv.*layer")
+MLP_TOKEN = re.compile(r"fc|linear|weight|bias")
+
+
 def infer_architecture(layer_info: list) -> str:
     """Attempt to infer architecture type from layer names."""
     layer_names = [l["name"].lower() for l in layer_info]
     layer_names_str = " ".join(layer_names)
 
+    # Collect every pattern present in a single pass over the joined names;
+    # checks that pair tokens within one name still run per name
+    flags = set(ARCH_TOKENS.findall(layer_names_str))
+
     # Check for common patterns
-    if "resnet" in layer_names_str or any("layer" in n and "conv" in n for n in layer_names):
-        if any("downsample" in n or "shortcut" in n for n in layer_names):
+    if "resnet" in flags or any(LAYER_CONV.search(n) for n in layer_names):
+        if "downsample" in flags or "shortcut" in flags:
             return "ResNet"
 
-    if any("conv" in n for n in layer_names):
-        if any("bn" in n or "batch" in n for n in layer_names):
-            return "CNN"
+    if "conv" in flags:
         return "CNN"
 
-    if any("attention" in n or "transformer" in n or "encoder" in n for n in layer_names):
-        return "Transformer"
-
-    if any("vit" in n or "patch_embed" in n for n in layer_names):
+    if flags & {"attention", "transformer", "encoder", "vit", "patch_embed"}:
         return "Transformer"
 
-    if all("fc" in n or "linear" in n or "weight" in n or "bias" in n for n in layer_names):
+    if all(MLP_TOKEN.search(n) for n in layer_names):
         return "MLP"
 
-    if any("yolo" in n or "detect" in n for n in layer_names):
+    if "yolo" in flags or "detect" in flags:
         return "YOLOv8"
 
     return "Custom"
@@ -326,7 +835,7 @@ def infer_architecture(layer_info: list) -> str:
 
 def main():
     parser = argparse.ArgumentParser(description="Convert PyTorch model to CoreML or MLX")
-    parser.add_argument("--input", required=True, help="Path to .pt/.pth file")
+    parser.add_argument("--input", required=True, help="Path to .pt/.pth (or .safetensors) file")
     parser.add_argument("--output", required=True, help="Output path")
     parser.add_argument("--format", required=True, choices=["coreml", "mlx"],
                         help="Target format")
@@ -334,29 +843,88 @@ def main():
                         help="Input shape as comma-separated values, e.g., 1,3,224,224")
     parser.add_argument("--name", default="Converted Model",
                         help="Model name for metadata")
+    parser.add_argument("--timeout", type=float, default=COREML_TIMEOUT,
+                        help="Maximum seconds to allow for CoreML conversion")
+    parser.add_argument("--dtype", default="preserve",
+                        choices=["preserve", "float32", "float16", "bfloat16"],
+                        help="Floating-point dtype for MLX weights (default: keep source dtype)")
+    parser.add_argument("--fast-passthrough", action="store_true",
+                        help="For MLX, read plain state_dict checkpoints without importing torch")
 
     args = parser.parse_args()
 
     try:
-        # Parse input shape
-        input_shape = tuple(map(int, args.input_shape.split(",")))
+        # Parse and validate input shape before anything allocates a tensor
+        try:
+            input_shape = tuple(int(d) for d in args.input_shape.split(","))
+        except ValueError:
+            error(f"Invalid input shape: {args.input_shape}", "INVALID_SHAPE")
+            sys.exit(1)
         log("info", f"Input shape: {input_shape}")
 
         if len(input_shape) < 2:
             error("Input shape must have at least 2 dimensions", "INVALID_SHAPE")
             sys.exit(1)
 
+        if any(d <= 0 for d in input_shape):
+            error("Input shape dimensions must be positive", "INVALID_SHAPE")
+            sys.exit(1)
+
+        if math.prod(input_shape) > MAX_INPUT_ELEMENTS:
+            error("Input shape too large", "INVALID_SHAPE")
+            sys.exit(1)
+
+        input_path = Path(args.input)
+        if not input_path.is_file():
+            error(f"Input file not found: {args.input}", "FILE_NOT_FOUND")
+            sys.exit(1)
+
+        # safetensors input is already weights-only; handle it without torch
+        # unless the weights need casting
+        if input_path.suffix.lower() == ".safetensors":
+            if args.format != "mlx":
+                error("CoreML conversion requires a traceable PyTorch model. Try MLX format instead.", "STATE_DICT_ONLY")
+                sys.exit(1)
+            if args.dtype == "preserve":
+                metadata = convert_safetensors_to_mlx(input_path, input_shape, args.output)
+            else:
+                try:
+                    from safetensors import safe_open
+                except ImportError:
+                    error("safetensors not installed. Run: pip install safetensors", "MISSING_PACKAGE")
+                    sys.exit(1)
+                # Tensors are read from the memory-mapped file; only the
+                # cast copies made by convert_to_mlx take extra RAM
+                with safe_open(str(input_path), framework="pt") as f:
+                    state_dict = {key: f.get_tensor(key) for key in f.keys()}
+                metadata = convert_to_mlx(state_dict, input_shape, args.output, None, args.dtype)
+            completed(args.output, args.format, metadata)
+            return
+
+        # Plain state_dict checkpoints can skip torch entirely when asked to
+        if args.fast_passthrough and args.format == "mlx" and args.dtype == "preserve":
+            try:
+                metadata = convert_checkpoint_without_torch(args.input, input_shape, args.output)
+                completed(args.output, args.format, metadata)
+                return
+            except (PassthroughUnavailable, pickle.UnpicklingError, zipfile.BadZipFile) as e:
+                log("info", f"Fast passthrough unavailable ({e}), loading with PyTorch")
+
         # Load model
-        traced_model, state_dict, checkpoint = load_pytorch_model(args.input, input_shape)
+        traced_model, state_dict, checkpoint = load_pytorch_model(
+            args.input, input_shape, args.format
+        )
 
         # Convert based on target format
         if args.format == "coreml":
             if traced_model is None:
                 error("CoreML conversion requires a traceable model. This checkpoint only contains weights (state_dict). Try MLX format instead.", "STATE_DICT_ONLY")
                 sys.exit(1)
-            metadata = convert_to_coreml(traced_model, input_shape, args.output, args.name)
+            metadata = convert_to_coreml(
+                traced_model, input_shape, args.output, args.name, args.timeout
+            )
         else:  # mlx
-            metadata = convert_to_mlx(state_dict, input_shape, args.output, checkpoint)
+            metadata = convert_to_mlx(state_dict, input_shape, args.output, checkpoint, args.dtype)
 
         completed(args.output, args.format, metadata)
 
@@ -3,6 +3,8 @@
 
 import subprocess
 import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 try:
@@ -12,25 +14,56 @@ except ImportError:
     subprocess.check_call(["pip3", "install", "Pillow"])
     from PIL import Image, ImageDraw, ImageFont, ImageFilter
 
+try:
+    import numpy as np
+except ImportError:
+    print("Installing NumPy...")
+    subprocess.check_call(["pip3", "install", "numpy"])
+    import numpy as np
+
+
+FONT_PATHS = [
+    "/System/Library/Fonts/SFNS.ttf",
+    "/System/Library/Fonts/SFNSDisplay.ttf",
+    "/System/Library/Fonts/Helvetica.ttc",
+]
+
+
+@lru_cache(maxsize=None)
+def _get_font(font_size: int):
+    """Load the first available system font at the given size."""
+    for path in FONT_PATHS:
+        try:
+            return ImageFont.truetype(path, font_size)
+        except (OSError, ImportError):
+            continue
+    return ImageFont.load_default()
+
+
+def _gradient(start: tuple, end: tuple, ratio: np.ndarray) -> np.ndarray:
+    """Interpolate between two colours, one row of channels per ratio value."""
+    return np.stack(
+        [a + (b - a) * ratio for a, b in zip(start, end)], axis=1
+    ).astype(np.uint8)
+
 
 def create_icon(size: int) -> Image.Image:
     """Create a sophisticated Performant3 icon."""
-    scale = 4
-    s = size * scale
+    # Supersample 4x, then resize with high quality
+    img = _render_at(size * 4)
+    return img.resize((size, size), Image.Resampling.LANCZOS)
 
-    img = Image.new('RGBA', (s, s), (0, 0, 0, 0))
-    draw = ImageDraw.Draw(img)
 
+def _render_at(s: int) -> Image.Image:
+    """Draw the icon artwork on an s x s canvas."""
     corner_radius = int(s * 0.22)
 
-    # Premium gradient: dark charcoal to deep slate blue
-    for y in range(s):
-        ratio = y / s
-        # Dark sophisticated gradient
-        r = int(18 + (28 - 18) * ratio)
-        g = int(20 + (32 - 20) * ratio)
-        b = int(28 + (48 - 28) * ratio)
-        draw.line([(0, y), (s, y)], fill=(r, g, b, 255))
+    # Premium gradient: dark charcoal to deep slate blue, computed per row
+    # in one vectorized pass and broadcast across the full width
+    colors = _gradient((18, 20, 28), (28, 32, 48), np.arange(s) / s)
+    gradient = np.broadcast_to(colors[:, np.newaxis, :], (s, s, 3))
+    img = Image.fromarray(np.ascontiguousarray(gradient)).convert('RGBA')
+    draw = ImageDraw.Draw(img)
 
     # Create mask for rounded corners
     mask = Image.new('L', (s, s), 0)
@@ -58,8 +91,12 @@ def create_icon(size: int) -> Image.Image:
     # Bar heights creating an ascending pattern
     heights = [0.25, 0.4, 0.55, 0.45, 0.65]
 
-    # Glow layer
-    glow_img = Image.new('RGBA', (s, s), (0, 0, 0, 0))
+    # Glow layer: one solid shape per bar, softened by a single blur pass.
+    # The transparent background shares the glow colour so the blur only
+    # spreads alpha and doesn't darken the edges.
+    glow_color = (100, 180, 255)
+    glow_spread = 15
+    glow_img = Image.new('RGBA', (s, s), glow_color + (0,))
     glow_draw = ImageDraw.Draw(glow_img)
 
     for i, h in enumerate(heights):
@@ -68,22 +105,20 @@ def create_icon(size: int) -> Image.Image:
         top_y = base_y - bar_height
 
         # Glow effect
-        for glow in range(15, 0, -3):
-            alpha = int(20 * (1 - glow / 15))
-            glow_draw.rounded_rectangle(
-                [(x - glow, top_y - glow), (x + bar_width + glow, base_y + glow)],
-                radius=int(bar_width * 0.3),
-                fill=(100, 180, 255, alpha)
-            )
-
-        # Gradient fill for bars
-        for by in range(top_y, base_y):
-            ratio = (by - top_y) / max(1, (base_y - top_y))
-            # Cyan to blue gradient
-            br = int(60 + (40 - 60) * ratio)
-            bg = int(200 + (140 - 200) * ratio)
-            bb = int(255 + (220 - 255) * ratio)
-            draw.line([(x, by), (x + bar_width, by)], fill=(br, bg, bb, 255))
+        pad = glow_spread // 3
+        glow_draw.rounded_rectangle(
+            [(x - pad, top_y - pad), (x + bar_width + pad, base_y + pad)],
+            radius=int(bar_width * 0.3),
+            fill=glow_color + (16,)
+        )
+
+        # Gradient fill for bars, pasted as a single precomputed stamp
+        rows = base_y - top_y
+        ratio = np.arange(rows) / max(1, rows)
+        # Cyan to blue gradient
+        colors = _gradient((60, 200, 255, 255), (40, 140, 220, 255), ratio)
+        fill = np.broadcast_to(colors[:, np.newaxis, :], (rows, bar_width + 1, 4))
+        img.paste(Image.fromarray(np.ascontiguousarray(fill)), (x, top_y))
 
         # Top rounded cap
         cap_radius = bar_width // 2
@@ -94,32 +129,17 @@ def create_icon(size: int) -> Image.Image:
 
         # Subtle highlight on left edge
         highlight_width = max(2, int(bar_width * 0.15))
-        for hy in range(top_y, base_y):
-            alpha = int(60 * (1 - (hy - top_y) / max(1, (base_y - top_y))))
-            draw.line(
-                [(x, hy), (x + highlight_width, hy)],
-                fill=(255, 255, 255, alpha)
-            )
+        highlight = np.full((rows, highlight_width + 1, 4), 255, dtype=np.uint8)
+        highlight[..., 3] = (60 * (1 - ratio)).astype(np.uint8)[:, np.newaxis]
+        img.paste(Image.fromarray(highlight), (x, top_y))
 
     # Composite glow
+    glow_img = glow_img.filter(ImageFilter.GaussianBlur(radius=glow_spread / 3))
     img = Image.alpha_composite(img, glow_img)
     draw = ImageDraw.Draw(img)
 
     # Stylized "P3" text - clean typography
-    try:
-        font_size = int(s * 0.18)
-        try:
-            font = ImageFont.truetype("/System/Library/Fonts/SFNS.ttf", font_size)
-        except:
-            try:
-                font = ImageFont.truetype("/System/Library/Fonts/SFNSDisplay.ttf", font_size)
-            except:
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-                except:
-                    font = ImageFont.load_default()
-    except:
-        font = ImageFont.load_default()
+    font = _get_font(int(s * 0.18))
 
     text = "P3"
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -144,16 +164,12 @@ def create_icon(size: int) -> Image.Image:
     line_y = text_y + text_h + int(s * 0.03)
     line_width = int(text_w * 0.8)
     line_x_start = center_x - line_width // 2
-    for lx in range(line_x_start, line_x_start + line_width):
-        ratio = (lx - line_x_start) / line_width
-        # Gradient from cyan to blue
-        lr = int(60 + (100 - 60) * ratio)
-        lg = int(200 + (160 - 200) * ratio)
-        lb = int(255 + (240 - 255) * ratio)
-        draw.line(
-            [(lx, line_y), (lx, line_y + max(2, int(s * 0.008)))],
-            fill=(lr, lg, lb, 200)
-        )
+    line_height = max(2, int(s * 0.008)) + 1
+    ratio = np.arange(line_width) / line_width
+    # Gradient from cyan to blue
+    colors = _gradient((60, 200, 255, 200), (100, 160, 240, 200), ratio)
+    accent = np.broadcast_to(colors[np.newaxis, :, :], (line_height, line_width, 4))
+    img.paste(Image.fromarray(np.ascontiguousarray(accent)), (line_x_start, line_y))
 
     # Subtle corner accent - premium detail
     accent_size = int(s * 0.06)
@@ -178,9 +194,6 @@ def create_icon(size: int) -> Image.Image:
             fill=(100, 200, 255, alpha)
         )
 
-    # Resize with high quality
-    img = img.resize((size, size), Image.Resampling.LANCZOS)
-
     return img
 
 
@@ -202,15 +215,39 @@ def create_iconset(output_dir: Path):
         (1024, "icon_512x512@2x.png"),
     ]
 
+    # Render the artwork once at the largest size and downsample from it
+    master_size = max(size for size, _ in sizes)
+    master = create_icon(master_size)
+
+    # Resize and PNG-encode each entry in parallel worker processes
+    master_bytes = master.tobytes()
+
     print("Generating icon sizes...")
-    for size, filename in sizes:
-        print(f"  {filename} ({size}x{size})")
-        icon = create_icon(size)
-        icon.save(iconset_dir / filename, "PNG")
+    with ProcessPoolExecutor() as pool:
+        futures = []
+        for size, filename in sizes:
+            print(f"  {filename} ({size}x{size})")
+            futures.append(pool.submit(
+                _resize_and_save, master_bytes, master_size, size, iconset_dir / filename
+            ))
+        for future in futures:
+            future.result()
 
     return iconset_dir
 
 
+def _resize_and_save(master_bytes: bytes, master_size: int, size: int, path: Path):
+    """Rebuild the master image in a worker process, resize it and save as PNG.
+
+    Uses fast, light compression: these files are build-time assets, so
+    encode speed matters more than the last few percent of size.
+    """
+    icon = Image.frombytes('RGBA', (master_size, master_size), master_bytes)
+    if size != master_size:
+        icon = icon.resize((size, size), Image.Resampling.LANCZOS)
+    icon.save(path, "PNG", compress_level=1, optimize=False)
+
+
 def create_icns(iconset_dir: Path, output_path: Path):
     """Convert iconset to icns using iconutil."""
     print(f"Creating {output_path.name}...")
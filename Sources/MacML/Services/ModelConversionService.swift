@@ -150,8 +150,10 @@ actor ModelConversionService {
         process.standardOutput = stdoutPipe
         process.standardError = stderrPipe
 
+        // Leave stdout buffered: the script flushes explicitly on progress,
+        // completed and error events, so log lines are batched with them
         var environment = ProcessInfo.processInfo.environment
-        environment["PYTHONUNBUFFERED"] = "1"
+        environment.removeValue(forKey: "PYTHONUNBUFFERED")
         process.environment = environment
 
         try process.run()
@@ -404,6 +406,10 @@ enum ConversionError: Error, LocalizedError {
                 return "This model uses operations not supported by Core ML. Try MLX format."
             case "SHAPE_MISMATCH":
                 return "Check the input shape matches what the model expects."
+            case "INVALID_SHAPE":
+                return "Enter the input shape as positive comma-separated dimensions, e.g. 1,3,224,224."
+            case "TIMEOUT":
+                return "Core ML compilation took too long for this model. Try MLX format instead."
             default:
                 return nil
             }
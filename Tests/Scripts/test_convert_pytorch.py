@@ -0,0 +1,98 @@
+"""Tests for Resources/Scripts/convert_pytorch.py."""
+
+import importlib.util
+import pickle
+import struct
+import zipfile
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+SCRIPT_PATH = Path(__file__).resolve().parents[2] / "Resources" / "Scripts" / "convert_pytorch.py"
+
+spec = importlib.util.spec_from_file_location("convert_pytorch", SCRIPT_PATH)
+convert_pytorch = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(convert_pytorch)
+
+
+def _global(module: str, name: str) -> bytes:
+    return pickle.GLOBAL + f"{module}\n{name}\n".encode()
+
+
+def _str(value: str) -> bytes:
+    data = value.encode()
+    return pickle.BINUNICODE + struct.pack("<I", len(data)) + data
+
+
+def _int(value: int) -> bytes:
+    return pickle.BININT + struct.pack("<i", value)
+
+
+def _tuple(values) -> bytes:
+    return pickle.MARK + b"".join(_int(v) for v in values) + pickle.TUPLE
+
+
+def write_checkpoint(path: Path, storage: np.ndarray, offset: int, size, stride, numel=None):
+    """Write a torch-style zip checkpoint holding one float32 tensor view."""
+    numel = _int(storage.size) if numel is None else numel
+    tensor = (
+        _global("torch._utils", "_rebuild_tensor_v2")
+        + pickle.MARK
+        + pickle.MARK + _str("storage") + _global("torch", "FloatStorage")
+        + _str("0") + _str("cpu") + numel + pickle.TUPLE + pickle.BINPERSID
+        + _int(offset) + _tuple(size) + _tuple(stride) + pickle.NEWFALSE + pickle.EMPTY_DICT
+        + pickle.TUPLE + pickle.REDUCE
+    )
+    data = (
+        pickle.PROTO + b"\x02"
+        + _global("collections", "OrderedDict") + pickle.EMPTY_TUPLE + pickle.REDUCE
+        + _str("weight") + tensor + pickle.SETITEM
+        + pickle.STOP
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+        archive.writestr("archive/data.pkl", data)
+        archive.writestr("archive/byteorder", "little")
+        archive.writestr("archive/data/0", storage.astype("<f4").tobytes())
+
+
+def test_fast_passthrough_reads_tensor_view(tmp_path):
+    path = tmp_path / "model.pt"
+    write_checkpoint(path, np.arange(6, dtype=np.float32), 1, (2, 2), (1, 2))
+
+    state_dict = convert_pytorch.load_state_dict_without_torch(str(path))
+
+    np.testing.assert_array_equal(state_dict["weight"], [[1, 3], [2, 4]])
+    assert state_dict["weight"].flags.c_contiguous
+
+
+@pytest.mark.parametrize("offset, size, stride", [
+    (2, (64,), (1,)),       # runs past the end of the storage
+    (100, (4,), (1,)),      # starts past the end of the storage
+    (3, (2,), (-1,)),       # negative stride walks backwards
+    (0, (2, 2), (1,)),      # size and stride rank mismatch
+])
+def test_fast_passthrough_rejects_out_of_bounds_views(tmp_path, offset, size, stride):
+    path = tmp_path / "model.pt"
+    write_checkpoint(path, np.zeros(4, dtype=np.float32), offset, size, stride)
+
+    with pytest.raises(pickle.UnpicklingError):
+        convert_pytorch.load_state_dict_without_torch(str(path))
+
+
+def test_fast_passthrough_allows_empty_tensor_at_end(tmp_path):
+    path = tmp_path / "model.pt"
+    write_checkpoint(path, np.zeros(4, dtype=np.float32), 4, (0, 3), (3, 1))
+
+    state_dict = convert_pytorch.load_state_dict_without_torch(str(path))
+
+    assert state_dict["weight"].shape == (0, 3)
+
+
+def test_fast_passthrough_reports_malformed_storage_as_unavailable(tmp_path):
+    path = tmp_path / "model.pt"
+    write_checkpoint(path, np.zeros(4, dtype=np.float32), 0, (4,), (1,), numel=_str("4"))
+
+    with pytest.raises(convert_pytorch.PassthroughUnavailable):
+        convert_pytorch.load_state_dict_without_torch(str(path))